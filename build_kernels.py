@@ -0,0 +1,27 @@
+""" Builds the ahead-of-time compiled mortgage_kernels extension.
+
+    Run `python build_kernels.py` (requires numba) to produce a
+    mortgage_kernels extension module next to MortgageModel.py.
+    MortgageModel prefers these pre-compiled kernels when the extension is
+    importable, which avoids the first-call JIT warmup in deployments.
+"""
+import os
+
+# Keep MortgageModel from replacing its kernels with a previously built
+# extension; rebuilding needs the plain-Python definitions.
+os.environ["MORTGAGE_KERNELS_SKIP_AOT"] = "1"
+
+from numba.pycc import CC
+
+from MortgageModel import _compute_cost, _pmt_scalar
+
+def _unwrap(func):
+    """ Returns the plain Python function behind an njit dispatcher."""
+    return getattr(func, "py_func", func)
+
+cc = CC("mortgage_kernels")
+cc.export("pmt_scalar", "f8(f8, f8, f8)")(_unwrap(_pmt_scalar))
+cc.export("compute_cost", "UniTuple(f8, 8)(f8, f8, f8, f8, f8, f8)")(_unwrap(_compute_cost))
+
+if __name__ == "__main__":
+    cc.compile()